@@ -76,8 +76,9 @@ async def deposit(
         )
 
     # Create transaction and update balance atomically
+    amount_cents = Decimal(transaction_data.amount_cents)
     new_transaction = Transaction(
-        amount_cents=Decimal(transaction_data.amount_cents),
+        amount_cents=amount_cents,
         transaction_type=transaction_data.transaction_type,
         idempotency_key=transaction_data.idempotency_key,
         account_id=account_id,
@@ -86,7 +87,7 @@ async def deposit(
     db.add(new_transaction)
 
     # Update account balance
-    account.balance_cents += Decimal(transaction_data.amount_cents)  # type: ignore[assignment]
+    account.balance_cents += amount_cents  # type: ignore[assignment]
 
     await db.commit()
     await db.refresh(new_transaction)
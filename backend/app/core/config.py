@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost factor used when hashing passwords
+
     # App
     APP_NAME: str = "My First Bank App"
     DEBUG: bool = False  # Set to False for production
@@ -4,25 +4,56 @@ Uses SQLite in-memory database for fast, isolated testing.
 """
 
 import asyncio
+import itertools
+from datetime import date
+from typing import Any, AsyncGenerator, Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
 from app.core.database import Base, get_db
+from app.core.security import create_access_token, pwd_context
 from app.main import app
+from app.models.account import Account
+from app.models.child import Child
+from app.models.transaction import Transaction
+from app.models.user import User
 
-# Test database configuration - use async SQLite for compatibility with app
+# Minimum bcrypt cost keeps register/login cheap; hash strength is irrelevant in tests
+pwd_context.update(bcrypt__rounds=4)
+
+# Test database configuration - use async SQLite for compatibility with app.
+# StaticPool makes the app and the fixtures share the in-memory database's single connection;
+# each pytest-xdist worker is its own process and so gets its own database.
 test_database_url = "sqlite+aiosqlite:///:memory:"
 
 test_engine = create_async_engine(
     test_database_url,
     connect_args={"check_same_thread": False},
-    poolclass=None,
+    poolclass=StaticPool,
     echo=False,
 )
 
-TestingSessionLocal = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+# Sessions are bound to the session-wide connection in setup_database and join its transaction
+# through a SAVEPOINT, so an app-level commit only releases that savepoint
+TestingSessionLocal = async_sessionmaker(
+    class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+)
+
+
+# The sqlite driver's own implicit transactions don't nest SAVEPOINTs properly, so emit BEGIN ourselves
+@event.listens_for(test_engine.sync_engine, "connect")
+def disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
 @pytest.fixture(scope="session")
@@ -46,16 +77,29 @@ async def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 
 
-@pytest.fixture
-async def setup_database():
-    """Set up the test database"""
+@pytest.fixture(scope="session")
+async def setup_database() -> AsyncGenerator[AsyncConnection, None]:
+    """Set up the test database once and keep one connection with an open transaction for the session"""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    yield
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        TestingSessionLocal.configure(bind=conn)
+        yield conn
+        await transaction.rollback()
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def rollback_test_changes(setup_database: AsyncConnection) -> AsyncGenerator[None, None]:
+    """Run each test inside a SAVEPOINT that is rolled back afterwards, instead of recreating the schema"""
+    savepoint = await setup_database.begin_nested()
+    yield
+    if savepoint.is_active:
+        await savepoint.rollback()
+
+
 @pytest.fixture
 async def db_session(setup_database):
     """Create a test database session"""
@@ -71,7 +115,134 @@ async def db_session(setup_database):
                 await session.close()
 
 
+@pytest.fixture(scope="session")
+def client(setup_database) -> Generator[TestClient, None, None]:
+    """Create one test client for the whole session, so the app's portal and lifespan start only once"""
+    with TestClient(app) as c:
+        # Warm up the middleware stack and routing once, so no test pays for the first request
+        c.get("/health")
+        yield c
+
+
+@pytest.fixture(scope="session")
+async def async_client(setup_database) -> AsyncGenerator[AsyncClient, None]:
+    """One AsyncClient for the whole session, calling the app in-process over ASGI"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+# One counter for every test module and fixture; the rolled-back test database makes a counter sufficient
+_email_counter = itertools.count()
+
+
+def get_unique_email() -> str:
+    """Generate a unique email address for testing"""
+    return f"test_{next(_email_counter)}@example.com"
+
+
+@pytest.fixture
+def unique_email() -> Callable[[], str]:
+    """Email generator for tests that register their own users"""
+    return get_unique_email
+
+
+_idempotency_key_counter = itertools.count()
+
+
+def get_unique_idempotency_key() -> str:
+    """Generate a unique idempotency key for testing"""
+    return f"test_key_{next(_idempotency_key_counter)}"
+
+
 @pytest.fixture
-def client(setup_database):
-    """Create a test client with test database setup"""
-    return TestClient(app)
+def unique_idempotency_key() -> Callable[[], str]:
+    """Idempotency key generator for tests that post deposits"""
+    return get_unique_idempotency_key
+
+
+async def register_test_user(client: AsyncClient) -> dict[str, str]:
+    """Register a fresh user and return its credentials together with the issued token"""
+    email = get_unique_email()
+    password = "testpassword123"
+    response = await client.post("/api/v1/auth/register", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return {"email": email, "password": password, "token": response.json()["access_token"]}
+
+
+@pytest.fixture(scope="session")
+async def primary_user(async_client) -> dict[str, str]:
+    """Register one user per session so tests don't pay for bcrypt and JWT signing each time"""
+    return await register_test_user(async_client)
+
+
+@pytest.fixture(scope="session")
+def primary_token(primary_user) -> str:
+    """Access token of the session-wide primary user"""
+    return primary_user["token"]
+
+
+@pytest.fixture(scope="session")
+async def secondary_token(async_client) -> str:
+    """Access token of a second user, for tests that check cross-user access"""
+    return (await register_test_user(async_client))["token"]
+
+
+@pytest.fixture(scope="session")
+async def primary_client(primary_token) -> AsyncGenerator[AsyncClient, None]:
+    """AsyncClient that sends the primary user's bearer token by default"""
+    headers = {"Authorization": f"Bearer {primary_token}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as ac:
+        yield ac
+
+
+@pytest.fixture(scope="module")
+async def prepared_account(primary_client) -> dict[str, Any]:
+    """Create one child per module for the primary user and expose its checking account"""
+    response = await primary_client.post("/api/v1/children/", json={"name": "Test Child", "birthdate": "2015-01-01"})
+    assert response.status_code == 200
+    return {"account_id": response.json()["accounts"][0]["id"]}
+
+
+@pytest.fixture
+async def account_with_one_tx(prepared_account) -> dict[str, Any]:
+    """prepared_account plus one deposit inserted through the ORM, rolled back with the test"""
+    # The row never outlives the test's SAVEPOINT, so a fixed key cannot collide
+    idempotency_key = "seeded_deposit"
+    async with TestingSessionLocal() as session:
+        session.add(
+            Transaction(
+                amount_cents=1000,
+                transaction_type="deposit",
+                idempotency_key=idempotency_key,
+                account_id=prepared_account["account_id"],
+            )
+        )
+        await session.commit()
+    return {**prepared_account, "idempotency_key": idempotency_key}
+
+
+@pytest.fixture(scope="module")
+def authed_client(client) -> tuple[TestClient, dict[str, str]]:
+    """Register one user per module and return the shared client with that user's auth headers"""
+    user_data = {"email": get_unique_email(), "password": "testpassword123"}
+    response = client.post("/api/v1/auth/register", json=user_data)
+    assert response.status_code == 200
+    return client, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+async def prepopulated_account(setup_database) -> tuple[int, dict[str, str]]:
+    """Insert a user, child and both accounts through the ORM and mint the user's token in-process.
+
+    Skips the register endpoint (bcrypt, JWT signing, extra round trips) for tests that only need
+    an account they own. Returns the checking account id and the auth headers.
+    """
+    async with TestingSessionLocal() as session:
+        user = User(email=get_unique_email(), hashed_password="hashed_password")
+        child = Child(name="Test Child", birthdate=date(2015, 1, 1), parent=user)
+        checking_account = Account(account_type="checking", balance_cents=0, child=child)
+        savings_account = Account(account_type="savings", balance_cents=0, child=child)
+        session.add_all([user, child, checking_account, savings_account])
+        await session.commit()
+        token = create_access_token(data={"sub": user.email})
+        return checking_account.id, {"Authorization": f"Bearer {token}"}
@@ -1,24 +1,20 @@
+from typing import Callable
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 @pytest.mark.asyncio
-async def test_create_allowance_rule(client, db_session: AsyncSession):
+async def test_create_allowance_rule(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test creating an allowance rule for a child."""
-    # Register and login to get token
-    unique_email = f"test_{hash('test_create_allowance_rule') % 10000}@example.com"
+    # Register to get token
+    email = unique_email()
     register_response = client.post(
         "/api/v1/auth/register",
-        json={"email": unique_email, "password": "testpassword123"},
+        json={"email": email, "password": "testpassword123"},
     )
     assert register_response.status_code == 200
-
-    login_response = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email, "password": "testpassword123"},
-    )
-    assert login_response.status_code == 200
-    token = login_response.json()["access_token"]
+    token = register_response.json()["access_token"]
 
     # Create a child first
     child_response = client.post(
@@ -48,22 +44,16 @@ async def test_create_allowance_rule(client, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_create_chore(client, db_session: AsyncSession):
+async def test_create_chore(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test creating a chore for a child."""
-    # Register and login to get token
-    unique_email = f"test_{hash('test_create_chore') % 10000}@example.com"
+    # Register to get token
+    email = unique_email()
     register_response = client.post(
         "/api/v1/auth/register",
-        json={"email": unique_email, "password": "testpassword123"},
+        json={"email": email, "password": "testpassword123"},
     )
     assert register_response.status_code == 200
-
-    login_response = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email, "password": "testpassword123"},
-    )
-    assert login_response.status_code == 200
-    token = login_response.json()["access_token"]
+    token = register_response.json()["access_token"]
 
     # Create a child first
     child_response = client.post(
@@ -97,22 +87,16 @@ async def test_create_chore(client, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_complete_chore(client, db_session: AsyncSession):
+async def test_complete_chore(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test marking a chore as completed."""
-    # Register and login to get token
-    unique_email = f"test_{hash('test_complete_chore') % 10000}@example.com"
+    # Register to get token
+    email = unique_email()
     register_response = client.post(
         "/api/v1/auth/register",
-        json={"email": unique_email, "password": "testpassword123"},
+        json={"email": email, "password": "testpassword123"},
     )
     assert register_response.status_code == 200
-
-    login_response = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email, "password": "testpassword123"},
-    )
-    assert login_response.status_code == 200
-    token = login_response.json()["access_token"]
+    token = register_response.json()["access_token"]
 
     # Create a child first
     child_response = client.post(
@@ -154,22 +138,16 @@ async def test_complete_chore(client, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_get_chore_summary(client, db_session: AsyncSession):
+async def test_get_chore_summary(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test getting a summary of chores and completions for a child."""
-    # Register and login to get token
-    unique_email = f"test_{hash('test_get_chore_summary') % 10000}@example.com"
+    # Register to get token
+    email = unique_email()
     register_response = client.post(
         "/api/v1/auth/register",
-        json={"email": unique_email, "password": "testpassword123"},
+        json={"email": email, "password": "testpassword123"},
     )
     assert register_response.status_code == 200
-
-    login_response = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email, "password": "testpassword123"},
-    )
-    assert login_response.status_code == 200
-    token = login_response.json()["access_token"]
+    token = register_response.json()["access_token"]
 
     # Create a child first
     child_response = client.post(
@@ -221,22 +199,16 @@ async def test_get_chore_summary(client, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_allowance_payout(client, db_session: AsyncSession):
+async def test_allowance_payout(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test processing allowance payout for a child."""
-    # Register and login to get token
-    unique_email = f"test_{hash('test_allowance_payout') % 10000}@example.com"
+    # Register to get token
+    email = unique_email()
     register_response = client.post(
         "/api/v1/auth/register",
-        json={"email": unique_email, "password": "testpassword123"},
+        json={"email": email, "password": "testpassword123"},
     )
     assert register_response.status_code == 200
-
-    login_response = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email, "password": "testpassword123"},
-    )
-    assert login_response.status_code == 200
-    token = login_response.json()["access_token"]
+    token = register_response.json()["access_token"]
 
     # Create a child first
     child_response = client.post(
@@ -275,11 +247,11 @@ async def test_allowance_payout(client, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_allowance_rule_ownership_validation(client, db_session: AsyncSession):
+async def test_allowance_rule_ownership_validation(client, db_session: AsyncSession, unique_email: Callable[[], str]):
     """Test that users can only access allowance rules for their own children."""
     # Create two users
-    unique_email1 = f"user1_{hash('test_ownership') % 10000}@example.com"
-    unique_email2 = f"user2_{hash('test_ownership') % 10000}@example.com"
+    unique_email1 = unique_email()
+    unique_email2 = unique_email()
 
     # Register user1
     register_response1 = client.post(
@@ -287,13 +259,7 @@ async def test_allowance_rule_ownership_validation(client, db_session: AsyncSess
         json={"email": unique_email1, "password": "testpassword123"},
     )
     assert register_response1.status_code == 200
-
-    login_response1 = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email1, "password": "testpassword123"},
-    )
-    assert login_response1.status_code == 200
-    token1 = login_response1.json()["access_token"]
+    token1 = register_response1.json()["access_token"]
 
     # Register user2
     register_response2 = client.post(
@@ -301,13 +267,7 @@ async def test_allowance_rule_ownership_validation(client, db_session: AsyncSess
         json={"email": unique_email2, "password": "testpassword123"},
     )
     assert register_response2.status_code == 200
-
-    login_response2 = client.post(
-        "/api/v1/auth/login",
-        json={"email": unique_email2, "password": "testpassword123"},
-    )
-    assert login_response2.status_code == 200
-    token2 = login_response2.json()["access_token"]
+    token2 = register_response2.json()["access_token"]
 
     # Create child for user1
     child_response = client.post(
@@ -3,22 +3,18 @@ Integration tests using TestClient with in-memory database.
 These tests can run in CI/CD without external dependencies.
 """
 
-import uuid
+from typing import Callable
 
+import pytest
 from fastapi.testclient import TestClient
 
 
-def get_unique_email() -> str:
-    """Generate a unique email address for testing."""
-    return f"test_{uuid.uuid4().hex[:8]}@example.com"
-
-
 class TestAuthEndpoints:
     """Test authentication endpoints."""
 
-    def test_register_user(self, client: TestClient, db_session):
+    def test_register_user(self, client: TestClient, unique_email: Callable[[], str]):
         """Test user registration."""
-        email = get_unique_email()
+        email = unique_email()
         user_data = {"email": email, "password": "testpassword123"}
 
         response = client.post("/api/v1/auth/register", json=user_data)
@@ -28,9 +24,9 @@ class TestAuthEndpoints:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
-    def test_register_user_duplicate_email(self, client: TestClient, db_session):
+    def test_register_user_duplicate_email(self, client: TestClient, unique_email: Callable[[], str]):
         """Test user registration with duplicate email."""
-        email = get_unique_email()
+        email = unique_email()
         user_data = {"email": email, "password": "testpassword123"}
 
         # First registration
@@ -42,16 +38,16 @@ class TestAuthEndpoints:
         assert response.status_code == 400
         assert "already registered" in response.json()["detail"]
 
-    def test_register_user_invalid_email(self, client: TestClient, db_session):
+    def test_register_user_invalid_email(self, client: TestClient):
         """Test user registration with invalid email."""
         user_data = {"email": "invalid-email", "password": "testpassword123"}
 
         response = client.post("/api/v1/auth/register", json=user_data)
         assert response.status_code == 422
 
-    def test_login_user(self, client: TestClient, db_session):
+    def test_login_user(self, client: TestClient, unique_email: Callable[[], str]):
         """Test user login."""
-        email = get_unique_email()
+        email = unique_email()
         password = "testpassword123"
 
         # Register user first
@@ -66,9 +62,9 @@ class TestAuthEndpoints:
         data = response.json()
         assert "access_token" in data
 
-    def test_login_user_wrong_password(self, client: TestClient, db_session):
+    def test_login_user_wrong_password(self, client: TestClient, unique_email: Callable[[], str]):
         """Test user login with wrong password."""
-        email = get_unique_email()
+        email = unique_email()
         password = "testpassword123"
 
         # Register user first
@@ -80,18 +76,18 @@ class TestAuthEndpoints:
         response = client.post("/api/v1/auth/login", json=login_data)
         assert response.status_code == 401
 
-    def test_login_user_nonexistent(self, client: TestClient, db_session):
+    def test_login_user_nonexistent(self, client: TestClient):
         """Test user login with nonexistent email."""
         login_data = {"email": "nonexistent@example.com", "password": "testpassword123"}
         response = client.post("/api/v1/auth/login", json=login_data)
         assert response.status_code == 401
 
-    def test_protected_endpoint_without_token(self, client: TestClient, db_session):
+    def test_protected_endpoint_without_token(self, client: TestClient):
         """Test accessing protected endpoint without token."""
         response = client.get("/api/v1/children/")
         assert response.status_code == 403
 
-    def test_protected_endpoint_with_invalid_token(self, client: TestClient, db_session):
+    def test_protected_endpoint_with_invalid_token(self, client: TestClient):
         """Test accessing protected endpoint with invalid token."""
         headers = {"Authorization": "Bearer invalid_token"}
         response = client.get("/api/v1/children/", headers=headers)
@@ -101,14 +97,9 @@ class TestAuthEndpoints:
 class TestChildEndpoints:
     """Test child management endpoints."""
 
-    def test_create_child_with_auth(self, client: TestClient, db_session):
+    def test_create_child_with_auth(self, authed_client: tuple[TestClient, dict[str, str]]):
         """Test creating a child with authentication."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
+        client, headers = authed_client
 
         # Create child
         child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
@@ -122,28 +113,19 @@ class TestChildEndpoints:
         assert any(acc["account_type"] == "checking" for acc in data["accounts"])
         assert any(acc["account_type"] == "savings" for acc in data["accounts"])
 
-    def test_create_child_invalid_data(self, client: TestClient, db_session):
+    def test_create_child_invalid_data(self, authed_client: tuple[TestClient, dict[str, str]]):
         """Test creating a child with invalid data."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
+        client, headers = authed_client
 
         # Create child with invalid data
         child_data = {"name": None, "birthdate": "2015-01-01"}  # Invalid name
         response = client.post("/api/v1/children/", json=child_data, headers=headers)
         assert response.status_code == 422
 
-    def test_list_children(self, client: TestClient, db_session):
+    def test_list_children(self, authed_client: tuple[TestClient, dict[str, str]]):
         """Test listing children."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
+        # authed_client's user has no children of its own; other tests' children are rolled back
+        client, headers = authed_client
 
         # Create a child first
         child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
@@ -161,20 +143,9 @@ class TestChildEndpoints:
 class TestTransactionEndpoints:
     """Test transaction and account endpoints."""
 
-    def test_transaction_pagination(self, client: TestClient, db_session):
+    def test_transaction_pagination(self, client: TestClient, prepopulated_account: tuple[int, dict[str, str]]):
         """Test transaction pagination."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
+        account_id, headers = prepopulated_account
 
         # Test pagination
         response = client.get(f"/api/v1/accounts/{account_id}/transactions?limit=10", headers=headers)
@@ -185,20 +156,11 @@ class TestTransactionEndpoints:
         assert "next_cursor" in data
         assert "has_more" in data
 
-    def test_transaction_pagination_with_cursor(self, client: TestClient, db_session):
+    def test_transaction_pagination_with_cursor(
+        self, client: TestClient, prepopulated_account: tuple[int, dict[str, str]]
+    ):
         """Test transaction pagination with cursor."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
+        account_id, headers = prepopulated_account
 
         # Test pagination with cursor
         response = client.get(f"/api/v1/accounts/{account_id}/transactions?limit=5", headers=headers)
@@ -212,23 +174,21 @@ class TestTransactionEndpoints:
             )
             assert cursor_response.status_code == 200
 
-    def test_deposit_with_idempotency(self, client: TestClient, db_session):
+    def test_deposit_with_idempotency(
+        self,
+        client: TestClient,
+        prepopulated_account: tuple[int, dict[str, str]],
+        unique_idempotency_key: Callable[[], str],
+    ):
         """Test deposit with idempotency."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
+        account_id, headers = prepopulated_account
 
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
-
-        # Make deposit
-        deposit_data = {"amount_cents": 1000, "transaction_type": "deposit", "idempotency_key": "test_key_123"}
+        # Make deposit; earlier tests' deposits were rolled back, so the balance starts at zero
+        deposit_data = {
+            "amount_cents": 1000,
+            "transaction_type": "deposit",
+            "idempotency_key": unique_idempotency_key(),
+        }
         response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
         assert response.status_code == 200
 
@@ -236,47 +196,21 @@ class TestTransactionEndpoints:
         assert data["new_balance_cents"] == "1000"
         assert data["transaction"]["amount_cents"] == "1000"  # amount_cents is returned as string
 
-    def test_deposit_amount_validation(self, client: TestClient, db_session):
-        """Test deposit amount validation."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
+    def test_deposit_duplicate_idempotency(
+        self,
+        client: TestClient,
+        prepopulated_account: tuple[int, dict[str, str]],
+        unique_idempotency_key: Callable[[], str],
+    ):
+        """Test deposit with duplicate idempotency key."""
+        account_id, headers = prepopulated_account
 
-        # Test minimum amount
+        # Make first deposit
         deposit_data = {
-            "amount_cents": 0,  # Below minimum
+            "amount_cents": 1000,
             "transaction_type": "deposit",
-            "idempotency_key": "test_key_min",
+            "idempotency_key": unique_idempotency_key(),
         }
-        response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
-        assert response.status_code == 400
-
-    def test_deposit_duplicate_idempotency(self, client: TestClient, db_session):
-        """Test deposit with duplicate idempotency key."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
-
-        # Make first deposit
-        deposit_data = {"amount_cents": 1000, "transaction_type": "deposit", "idempotency_key": "test_key_dup"}
         response1 = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
         assert response1.status_code == 200
 
@@ -289,122 +223,9 @@ class TestTransactionEndpoints:
         data2 = response2.json()
         assert data1["transaction"]["id"] == data2["transaction"]["id"]
 
-    def test_deposit_invalid_account(self, client: TestClient, db_session):
-        """Test deposit to invalid account."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Try to deposit to non-existent account
-        deposit_data = {"amount_cents": 1000, "transaction_type": "deposit", "idempotency_key": "test_key_invalid"}
-        response = client.post("/api/v1/accounts/99999/deposit", json=deposit_data, headers=headers)
-        assert response.status_code == 404
-
-    def test_deposit_unauthorized_account(self, client: TestClient, db_session):
-        """Test deposit to unauthorized account."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
-
-        # Create another user and try to access first user's account
-        email2 = get_unique_email()
-        user_data2 = {"email": email2, "password": "testpassword123"}
-        register_response2 = client.post("/api/v1/auth/register", json=user_data2)
-        token2 = register_response2.json()["access_token"]
-        headers2 = {"Authorization": f"Bearer {token2}"}
-
-        deposit_data = {"amount_cents": 1000, "transaction_type": "deposit", "idempotency_key": "test_key_unauthorized"}
-        response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers2)
-        assert response.status_code == 404  # Account not found for this user
-
-    def test_transactions_invalid_account(self, client: TestClient, db_session):
-        """Test getting transactions for invalid account."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Try to get transactions for non-existent account
-        response = client.get("/api/v1/accounts/99999/transactions", headers=headers)
-        assert response.status_code == 404
-
-    def test_transactions_unauthorized_account(self, client: TestClient, db_session):
-        """Test getting transactions for unauthorized account."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
-
-        # Create another user and try to access first user's account
-        email2 = get_unique_email()
-        user_data2 = {"email": email2, "password": "testpassword123"}
-        register_response2 = client.post("/api/v1/auth/register", json=user_data2)
-        token2 = register_response2.json()["access_token"]
-        headers2 = {"Authorization": f"Bearer {token2}"}
-
-        response = client.get(f"/api/v1/accounts/{account_id}/transactions", headers=headers2)
-        assert response.status_code == 404  # Account not found for this user
-
-    def test_deposit_max_amount_exceeded(self, client: TestClient, db_session):
-        """Test deposit exceeding maximum amount."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
-
-        # Test maximum amount (assuming MAX_DEPOSIT_AMOUNT_CENTS is 1000000)
-        deposit_data = {
-            "amount_cents": 1000001,  # Above maximum
-            "transaction_type": "deposit",
-            "idempotency_key": "test_key_max",
-        }
-        response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
-        assert response.status_code == 400
-
-    def test_transactions_with_valid_cursor(self, client: TestClient, db_session):
+    def test_transactions_with_valid_cursor(self, client: TestClient, prepopulated_account: tuple[int, dict[str, str]]):
         """Test transactions with valid cursor pagination."""
-        # First register and login to get token
-        email = get_unique_email()
-        user_data = {"email": email, "password": "testpassword123"}
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Create a child (which creates accounts)
-        child_data = {"name": "Test Child", "birthdate": "2015-01-01"}
-        child_response = client.post("/api/v1/children/", json=child_data, headers=headers)
-        child_data = child_response.json()
-        account_id = child_data["accounts"][0]["id"]  # Use checking account
+        account_id, headers = prepopulated_account
 
         # Test cursor pagination
         response = client.get(f"/api/v1/accounts/{account_id}/transactions?limit=1", headers=headers)
@@ -414,3 +235,60 @@ class TestTransactionEndpoints:
         assert "transactions" in data
         assert "next_cursor" in data
         assert "has_more" in data
+
+    @pytest.mark.parametrize(
+        "amount_cents,expected_status",
+        [(0, 400), (1000001, 400), (1000, 200)],
+        ids=["below_minimum", "above_maximum", "valid"],
+    )
+    def test_deposit_amount_validation(
+        self,
+        client: TestClient,
+        prepopulated_account: tuple[int, dict[str, str]],
+        amount_cents: int,
+        expected_status: int,
+        unique_idempotency_key: Callable[[], str],
+    ):
+        """Test deposit amount limits (MAX_DEPOSIT_AMOUNT_CENTS is 1000000)."""
+        account_id, headers = prepopulated_account
+        deposit_data = {
+            "amount_cents": amount_cents,
+            "transaction_type": "deposit",
+            "idempotency_key": unique_idempotency_key(),
+        }
+        response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
+        assert response.status_code == expected_status
+
+    @pytest.mark.parametrize("endpoint", ["deposit", "transactions"])
+    @pytest.mark.parametrize(
+        "account,expected_status",
+        [("own", 200), ("other_user", 404), ("nonexistent", 404)],
+    )
+    def test_account_authorization(
+        self,
+        client: TestClient,
+        prepopulated_account: tuple[int, dict[str, str]],
+        secondary_token: str,
+        endpoint: str,
+        account: str,
+        expected_status: int,
+        unique_idempotency_key: Callable[[], str],
+    ):
+        """Test that accounts are only reachable by the parent who owns them."""
+        account_id, headers = prepopulated_account
+        # The module's prepopulated user owns account_id; a missing account and another user's account both 404
+        if account == "other_user":
+            headers = {"Authorization": f"Bearer {secondary_token}"}
+        if account == "nonexistent":
+            account_id = 99999
+
+        if endpoint == "deposit":
+            deposit_data = {
+                "amount_cents": 1000,
+                "transaction_type": "deposit",
+                "idempotency_key": unique_idempotency_key(),
+            }
+            response = client.post(f"/api/v1/accounts/{account_id}/deposit", json=deposit_data, headers=headers)
+        else:
+            response = client.get(f"/api/v1/accounts/{account_id}/transactions", headers=headers)
+        assert response.status_code == expected_status
@@ -4,6 +4,7 @@ These tests can run in CI/CD without external database dependencies.
 """
 
 from datetime import date
+from typing import Callable
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,35 +15,22 @@ from app.models.transaction import Transaction
 from app.models.user import User
 
 
-# Helper function to generate unique emails for tests
-def get_unique_email() -> str:
-    """Generate a unique email address for testing"""
-    import uuid
-
-    return f"test_{uuid.uuid4().hex[:8]}@example.com"
+# Helper function to build test data
+def build_child(email: str) -> Child:
+    """Build an unsaved child together with its parent user"""
+    parent = User(email=email, hashed_password="hashed_password")
+    return Child(name="Test Child", birthdate=date(2015, 1, 1), parent=parent)
 
 
 @pytest.mark.asyncio
-async def test_create_child_with_accounts(db_session: AsyncSession) -> None:
+async def test_create_child_with_accounts(db_session: AsyncSession, unique_email: Callable[[], str]) -> None:
     """Test creating a child and then manually creating accounts"""
-    # Create a user
-    user = User(email=get_unique_email(), hashed_password="hashed_password")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-
-    # Create a child
-    child = Child(name="Test Child", birthdate=date(2015, 1, 1), parent_id=user.id)
-    db_session.add(child)
-    await db_session.commit()
-    await db_session.refresh(child)
-
-    # Manually create accounts for the child
-    checking_account = Account(account_type="checking", balance_cents=0, child_id=child.id)
-    savings_account = Account(account_type="savings", balance_cents=0, child_id=child.id)
+    # Create a user, a child and both accounts in a single transaction
+    child = build_child(unique_email())
+    checking_account = Account(account_type="checking", balance_cents=0, child=child)
+    savings_account = Account(account_type="savings", balance_cents=0, child=child)
 
-    db_session.add(checking_account)
-    db_session.add(savings_account)
+    db_session.add_all([child, checking_account, savings_account])
     await db_session.commit()
 
     # Check that accounts were created
@@ -55,12 +43,11 @@ async def test_create_child_with_accounts(db_session: AsyncSession) -> None:
 
 
 @pytest.mark.asyncio
-async def test_create_user(db_session: AsyncSession) -> None:
+async def test_create_user(db_session: AsyncSession, unique_email: Callable[[], str]) -> None:
     """Test creating a user"""
-    user = User(email=get_unique_email(), hashed_password="hashed_password")
+    user = User(email=unique_email(), hashed_password="hashed_password")
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
 
     assert user.id is not None
     assert user.email is not None
@@ -68,81 +55,43 @@ async def test_create_user(db_session: AsyncSession) -> None:
 
 
 @pytest.mark.asyncio
-async def test_create_child(db_session: AsyncSession) -> None:
+async def test_create_child(db_session: AsyncSession, unique_email: Callable[[], str]) -> None:
     """Test creating a child"""
-    # Create a user first
-    user = User(email=get_unique_email(), hashed_password="hashed_password")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-
-    # Create a child
-    child = Child(name="Test Child", birthdate=date(2015, 1, 1), parent_id=user.id)
+    # Create a user and a child together
+    child = build_child(unique_email())
     db_session.add(child)
     await db_session.commit()
-    await db_session.refresh(child)
 
     assert child.id is not None
     assert child.name == "Test Child"
     assert child.birthdate == date(2015, 1, 1)
-    assert child.parent_id == user.id
+    assert child.parent_id == child.parent.id
 
 
 @pytest.mark.asyncio
-async def test_create_account(db_session: AsyncSession) -> None:
+async def test_create_account(db_session: AsyncSession, unique_email: Callable[[], str]) -> None:
     """Test creating an account"""
-    # Create a user first
-    user = User(email=get_unique_email(), hashed_password="hashed_password")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-
-    # Create a child
-    child = Child(name="Test Child", birthdate=date(2015, 1, 1), parent_id=user.id)
-    db_session.add(child)
-    await db_session.commit()
-    await db_session.refresh(child)
-
-    # Create an account
-    account = Account(account_type="checking", balance_cents=0, child_id=child.id)
+    # Create the user, child and account in one commit
+    account = Account(account_type="checking", balance_cents=0, child=build_child(unique_email()))
     db_session.add(account)
     await db_session.commit()
-    await db_session.refresh(account)
 
     assert account.id is not None
     assert account.account_type == "checking"
     assert account.balance_cents == 0
-    assert account.child_id == child.id
+    assert account.child_id == account.child.id
 
 
 @pytest.mark.asyncio
-async def test_create_transaction(db_session: AsyncSession) -> None:
+async def test_create_transaction(db_session: AsyncSession, unique_email: Callable[[], str]) -> None:
     """Test creating a transaction"""
-    # Create a user first
-    user = User(email=get_unique_email(), hashed_password="hashed_password")
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-
-    # Create a child
-    child = Child(name="Test Child", birthdate=date(2015, 1, 1), parent_id=user.id)
-    db_session.add(child)
-    await db_session.commit()
-    await db_session.refresh(child)
-
-    # Create an account
-    account = Account(account_type="checking", balance_cents=0, child_id=child.id)
-    db_session.add(account)
-    await db_session.commit()
-    await db_session.refresh(account)
-
-    # Create a transaction
+    # Create the user, child, account and transaction in one commit
+    account = Account(account_type="checking", balance_cents=0, child=build_child(unique_email()))
     transaction = Transaction(
-        amount_cents=1000, transaction_type="deposit", idempotency_key="test_key_123", account_id=account.id
+        amount_cents=1000, transaction_type="deposit", idempotency_key="test_key_123", account=account
     )
     db_session.add(transaction)
     await db_session.commit()
-    await db_session.refresh(transaction)
 
     assert transaction.id is not None
     assert transaction.amount_cents == 1000